@@ -1,4 +1,5 @@
 import psutil
+import os
 import time
 import csv
 import logging
@@ -19,14 +20,28 @@ def configure_logging(mode: str):
 def get_pid(process_name) -> Optional[int]:
     """
     Get the PID from process name.
-    
+
+    Scans /proc directly and reads only /proc/<pid>/comm of each entry,
+    which is much cheaper than building a psutil.Process for every PID.
+
     Returns:
         Optional[int]: The PID if found, else None.
     """
-    for proc in psutil.process_iter(['pid', 'name']):
-        if proc.info['name'] == process_name:
-            logging.debug(f"Found {process_name} with PID {proc.info['pid']}")
-            return proc.info['pid']
+    target = process_name.encode()
+    with os.scandir('/proc') as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry.name}/comm', 'rb') as f:
+                    comm = f.read().rstrip()
+            except OSError:
+                # The process exited between listing and reading
+                continue
+            if comm == target:
+                pid = int(entry.name)
+                logging.debug(f"Found {process_name} with PID {pid}")
+                return pid
     return None
 
 def wait_for_parsecmgmt() -> int:
@@ -71,6 +86,10 @@ def get_process_group(pid: int) -> List[psutil.Process]:
         logging.error(f"No such process with PID {pid}.")
         return []
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Number of samples buffered before they are written to the CSV file
+WRITE_BATCH_SIZE = 64
+
 def monitor_cpu_usage(pid: int, interval: float = 1.0, log_file: str = './log/cpu_usage.csv'):
     """
     Monitor the CPU usage of a process group and log the results to a CSV file.
@@ -90,20 +109,44 @@ def monitor_cpu_usage(pid: int, interval: float = 1.0, log_file: str = './log/cp
         return
 
     cpu_count = psutil.cpu_count()
-    
+
     try:
         with open(log_file, mode='w', newline='') as file:
             writer = csv.writer(file)
             header = ['Timestamp'] + [f'CPU {i} (%)' for i in range(cpu_count)]
             writer.writerow(header)
 
-            while psutil.pid_exists(pid):
-                cpu_usages = [proc.cpu_percent(interval=0) for proc in process_group if proc.is_running()]
-                time.sleep(interval)
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                cpu_percentages = psutil.cpu_percent(percpu=True)
-                writer.writerow([timestamp] + cpu_percentages)
-                logging.info(f"Timestamp: {timestamp}, CPU Usages: {cpu_percentages}")
+            parent = process_group[0]
+            rows = []
+            next_tick = time.monotonic()
+            try:
+                while True:
+                    try:
+                        parent.status()
+                    except psutil.NoSuchProcess:
+                        break
+
+                    # Sleep until an absolute deadline so the sampling work doesn't make the interval drift
+                    next_tick += interval
+                    delay = next_tick - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # Overran the deadline (e.g. stalled machine): re-base instead of firing the
+                        # missed ticks back to back, which would sample near-empty windows as 0 %
+                        next_tick = time.monotonic()
+
+                    timestamp = time.strftime(TIMESTAMP_FORMAT)
+
+                    cpu_percentages = psutil.cpu_percent(percpu=True)
+                    rows.append([timestamp] + cpu_percentages)
+                    if len(rows) >= WRITE_BATCH_SIZE:
+                        writer.writerows(rows)
+                        rows.clear()
+                        file.flush()
+                    logging.info(f"Timestamp: {timestamp}, CPU Usages: {cpu_percentages}")
+            finally:
+                writer.writerows(rows)
     except KeyboardInterrupt:
         logging.info("Monitoring stopped by user.")
     except Exception as e:
@@ -114,6 +157,8 @@ def main(log_file: str = './log/cpuusage.csv', interval: float = 1.0, mode: str
     pid = get_pid('parsecmgmt')
     if pid is None:
         pid = wait_for_parsecmgmt()
+        if pid is None:
+            return
     monitor_cpu_usage(pid, interval, log_file)
 
 if __name__ == "__main__":
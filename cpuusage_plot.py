@@ -1,12 +1,30 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Only files are written; no interactive backend needed
 import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import logging
+import multiprocessing
+import concurrent.futures
 from datetime import datetime, timedelta
 from typing import Tuple, List
 
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Workers are forked from this already-initialized process so they inherit the imported
+# modules (pandas, matplotlib and its font cache) copy-on-write instead of importing them cold.
+# fork is only available on Linux/macOS; elsewhere the platform default (spawn) is used
+# and every worker pays the warmup itself.
+POOL_CONTEXT = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+# Format written by cpuusage_monitor.monitor_cpu_usage
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 # Set up logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(levelname)s:%(message)s')
 
@@ -34,7 +52,7 @@ def parse_filename(filename: str) -> Tuple[str, str]:
     
     return kernel, benchmark
 
-def load_and_process_csv(filename: str) -> Tuple[pd.DataFrame, int]:
+def load_and_process_csv(filename: str) -> Tuple[np.ndarray, np.ndarray, int, List[str]]:
     """
     Loads the CSV file and processes it to extract CPU usage data.
     
@@ -42,66 +60,77 @@ def load_and_process_csv(filename: str) -> Tuple[pd.DataFrame, int]:
     filename (str): The path to the CSV file.
     
     Returns:
-    Tuple[pd.DataFrame, int]: A DataFrame containing the processed CPU usage data,
-                              and the number of CPUs.
+    Tuple[np.ndarray, np.ndarray, int, List[str]]: A float32 array of shape (num_cpus, n_samples)
+                                                   with the CPU usage data, the elapsed time (s)
+                                                   of each sample, the number of CPUs, and
+                                                   the CPU labels ('CPU 0', 'CPU 1', ...).
     """
     assert isinstance(filename, str), "Filename must be a string"
     
     try:
-        df = pd.read_csv(filename, parse_dates=['Timestamp'])
+        # Read timestamps as plain strings; an explicit format is far cheaper than parse_dates inference
+        df = pd.read_csv(filename, engine=CSV_ENGINE, dtype={'Timestamp': 'string'})
         logging.debug(f"CSV loaded successfully with shape: {df.shape}")
         
         # Calculate elapsed time in seconds from the first timestamp
-        df['Elapsed time (s)'] = (df['Timestamp'] - df['Timestamp'].iloc[0]).dt.total_seconds()
-        
-        # Drop the Timestamp column as we now have 'Elapsed time (s)'
-        df = df.drop(columns=['Timestamp'])
+        timestamps = pd.to_datetime(df['Timestamp'], format=TIMESTAMP_FORMAT, cache=True)
+        elapsed = (timestamps - timestamps.iloc[0]).dt.total_seconds().to_numpy()
         
         # Determine the number of CPUs based on the columns
-        num_cpus = len(df.columns) - 1  # Subtract 1 for the 'Elapsed time (s)' column
+        num_cpus = len(df.columns) - 1  # Subtract 1 for the 'Timestamp' column
+        
+        # Reuse the header names ('CPU i (%)') as axis labels instead of formatting new ones
+        cpu_labels = [column.removesuffix(' (%)') for column in df.columns[1:]]
+        
+        # One CPU per row; the transpose is a view, so only the float32 conversion copies
+        cpu_usage = df.iloc[:, 1:].to_numpy(dtype=np.float32).T
         
-        logging.debug(f"Processed DataFrame with elapsed time. Number of CPUs: {num_cpus}")
+        logging.debug(f"Processed CPU usage data with shape: {cpu_usage.shape}. Number of CPUs: {num_cpus}")
         
-        return df, num_cpus
+        return cpu_usage, elapsed, num_cpus, cpu_labels
     
     except Exception as e:
         logging.error(f"Error processing file {filename}: {e}")
         raise
 
-def plot_heatmap(df: pd.DataFrame, num_cpus: int, kernel: str, benchmark: str) -> None:
+def plot_heatmap(cpu_usage: np.ndarray, elapsed: np.ndarray, num_cpus: int, cpu_labels: List[str], kernel: str, benchmark: str) -> None:
     """
     Generates a heatmap of CPU usage over time.
     
     Args:
-    df (pd.DataFrame): The DataFrame containing CPU usage data.
+    cpu_usage (np.ndarray): The CPU usage data, one row per CPU.
+    elapsed (np.ndarray): The elapsed time (s) of each sample.
     num_cpus (int): The number of CPUs.
+    cpu_labels (List[str]): The label of each CPU row.
     kernel (str): The kernel name.
     benchmark (str): The benchmark name.
     """
-    assert isinstance(df, pd.DataFrame), "Input must be a pandas DataFrame"
+    assert isinstance(cpu_usage, np.ndarray) and cpu_usage.ndim == 2, "Input must be a 2D numpy array"
     assert isinstance(num_cpus, int) and num_cpus > 0, "Number of CPUs must be a positive integer"
     assert isinstance(kernel, str), "Kernel name must be a string"
     assert isinstance(benchmark, str), "Benchmark name must be a string"
     
-    plt.figure(figsize=(12, num_cpus))
+    fig, ax = plt.subplots(figsize=(12, num_cpus))
     
-    # Extract the CPU usage columns
-    cpu_usage_data = df[[f'CPU {i} (%)' for i in range(num_cpus)]].T
+    # Create the heatmap as a single image rather than one mesh cell per sample
+    image = ax.imshow(cpu_usage, aspect='auto', cmap="YlGnBu", vmin=0, vmax=100, interpolation='nearest')
+    fig.colorbar(image, ax=ax, label='CPU Usage (%)')
     
-    # Create the heatmap
-    sns.heatmap(cpu_usage_data, cmap="YlGnBu", cbar_kws={'label': 'CPU Usage (%)'})
+    # Label only a subsample of the time axis instead of every column
+    ticks = np.arange(0, len(elapsed), max(1, len(elapsed) // 20))
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([f'{t:g}' for t in elapsed[ticks]], rotation=45)
     
     # Configure the plot
-    plt.title(f'CPU Usage Heatmap for {kernel} - {benchmark}')
-    plt.xlabel('Elapsed time (s)')
-    plt.ylabel('CPU Number')
-    plt.yticks(np.arange(0.5, num_cpus, 1), labels=[f'CPU {i}' for i in range(num_cpus)], rotation=0)
-    plt.xticks(rotation=45)
+    ax.set_title(f'CPU Usage Heatmap for {kernel} - {benchmark}')
+    ax.set_xlabel('Elapsed time (s)')
+    ax.set_ylabel('CPU Number')
+    ax.set_yticks(range(num_cpus), labels=cpu_labels)
     
     output_filename = f'./log/{kernel}--{benchmark}-cpuusage.png'
-    plt.savefig(output_filename, bbox_inches='tight')
+    fig.savefig(output_filename, bbox_inches='tight')
     logging.info(f"Heatmap saved to {output_filename}")
-    plt.close()
+    plt.close(fig)
 
 def process_csv_to_heatmap(filename: str) -> None:
     """
@@ -112,8 +141,8 @@ def process_csv_to_heatmap(filename: str) -> None:
     """
     logging.info(f"Processing file: {filename}")
     kernel, benchmark = parse_filename(filename)
-    df, num_cpus = load_and_process_csv(filename)
-    plot_heatmap(df, num_cpus, kernel, benchmark)
+    cpu_usage, elapsed, num_cpus, cpu_labels = load_and_process_csv(filename)
+    plot_heatmap(cpu_usage, elapsed, num_cpus, cpu_labels, kernel, benchmark)
 
 def find_csv_files(directory: str) -> List[str]:
     """
@@ -128,11 +157,13 @@ def find_csv_files(directory: str) -> List[str]:
     assert isinstance(directory, str), "Directory path must be a string"
     
     try:
-        csv_files = [
-            os.path.join(directory, file)
-            for file in os.listdir(directory)
-            if file.endswith('-cpuusage.csv') and os.path.isfile(os.path.join(directory, file))
-        ]
+        # DirEntry.is_file() uses the d_type from the directory listing, avoiding a stat per entry
+        with os.scandir(directory) as entries:
+            csv_files = [
+                entry.path
+                for entry in entries
+                if entry.name.endswith('-cpuusage.csv') and entry.is_file()
+            ]
         logging.debug(f"Found {len(csv_files)} CSV files in directory: {directory}")
     except Exception as e:
         logging.error(f"Error finding CSV files in directory {directory}: {e}")
@@ -152,11 +183,15 @@ def main():
             logging.warning(f"No CSV files found in directory: {csv_directory}")
             return
         
-        for csv_file in csv_files:
-            try:
-                process_csv_to_heatmap(csv_file)
-            except Exception as e:
-                logging.error(f"Failed to process {csv_file}: {e}")
+        # Each file is parsed and rendered independently, so spread them over the cores
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(csv_files), os.cpu_count() or 1),
+                                                    mp_context=POOL_CONTEXT) as executor:
+            futures = {executor.submit(process_csv_to_heatmap, csv_file): csv_file for csv_file in csv_files}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Failed to process {futures[future]}: {e}")
     
     except Exception as e:
         logging.critical(f"Critical error in main processing: {e}")
@@ -1,6 +1,8 @@
 import os
+import csv
 import argparse
-import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Charts are only saved to files
 import matplotlib.pyplot as plt
 from typing import List, Dict
 import logging
@@ -24,50 +26,34 @@ def make_kernel_names(log_dir: str = './log') -> List[str]:
         logging.error(f"Error while making kernel names: {e}")
         return []
 
-def read_csv_data(kernel_name: str, benchmark: str, log_dir: str = './log') -> pd.DataFrame:
+def load_summary(kernel_name: str, benchmark: str, log_dir: str = './log') -> Dict[str, Dict[str, float]]:
+    file_path = os.path.join(log_dir, f"{kernel_name}--{benchmark}-summary.csv")
     try:
-        file_path = os.path.join(log_dir, f"{kernel_name}--{benchmark}-summary.csv")
         logging.debug(f"Reading data from {file_path}")
-        df = pd.read_csv(file_path)
-        return df
+        with open(file_path, newline='') as f:
+            reader = csv.reader(f)
+            categories = next(reader)[1:]
+            # {'average': {'total': ..., 'real': ...}, 'max': {...}, 'min': {...}, 'stdev': {...}}
+            return {row[0]: dict(zip(categories, map(float, row[1:]))) for row in reader if row}
     except FileNotFoundError:
         logging.error(f"File not found: {file_path}")
-        return pd.DataFrame()
+        return {}
     except Exception as e:
         logging.error(f"Error reading CSV file: {e}")
-        return pd.DataFrame()
+        return {}
 
-def extract_data(df: pd.DataFrame, category: str) -> float:
+def extract_stat(summary: Dict[str, Dict[str, float]], stat: str, category: str) -> float:
     try:
-        assert not df.empty, "DataFrame is empty"
-        filtered_df = df[df['Unnamed: 0'] == 'average']
-        value = filtered_df[category].values[0]
-        logging.debug(f"Extracted data for category {category}: {value}")
+        value = summary[stat][category]
+        logging.debug(f"Extracted {stat} for category {category}: {value}")
         return value
-    except AssertionError as e:
-        logging.error(f"Assertion error: {e}")
-        return 0.0
-    except Exception as e:
-        logging.error(f"Error extracting data: {e}")
+    except KeyError as e:
+        logging.error(f"Error extracting {stat}: missing {e}")
         return 0.0
 
-def extract_stdev(df: pd.DataFrame, category: str) -> float:
+def plot_data(ax: plt.Axes, data: Dict[str, Dict[str, float]], stdev_data: Dict[str, Dict[str, float]], category: str, benchmarks: List[str], output_dir: str = './log', relative: bool = False):
     try:
-        assert not df.empty, "DataFrame is empty"
-        filtered_df = df[df['Unnamed: 0'] == 'stdev']
-        value = filtered_df[category].values[0]
-        logging.debug(f"Extracted stdev for category {category}: {value}")
-        return value
-    except AssertionError as e:
-        logging.error(f"Assertion error: {e}")
-        return 0.0
-    except Exception as e:
-        logging.error(f"Error extracting stdev: {e}")
-        return 0.0
-
-def plot_data(data: Dict[str, Dict[str, float]], stdev_data: Dict[str, Dict[str, float]], category: str, benchmarks: List[str], output_dir: str = './log', relative: bool = False):
-    try:
-        fig, ax = plt.subplots()
+        ax.clear()  # the Axes is reused across categories
         bar_width = 0.2
         index = range(len(benchmarks))
 
@@ -81,8 +67,6 @@ def plot_data(data: Dict[str, Dict[str, float]], stdev_data: Dict[str, Dict[str,
             else:
                 ax.bar(bar_positions, [values[benchmark] for benchmark in benchmarks], bar_width, label=kernel_name)
 
-        plt.rcParams['ytick.direction'] = 'in'
-
         ax.set_xlabel('Benchmarks')
         if relative:
             ax.set_ylabel('Improvement')
@@ -100,8 +84,7 @@ def plot_data(data: Dict[str, Dict[str, float]], stdev_data: Dict[str, Dict[str,
         # Create output file name
         suffix = '-relative.png' if relative else '.png'
         output_file = os.path.join(output_dir, '-'.join(benchmarks) + f'-{category}{suffix}')
-        plt.subplots_adjust(bottom=0.3)  # adjust bottom margin
-        plt.savefig(output_file)
+        ax.figure.savefig(output_file)
         logging.debug(f"Graph saved to {output_file}")
     except Exception as e:
         logging.error(f"Error plotting data: {e}")
@@ -115,23 +98,29 @@ def main():
     kernel_names.sort()  # Ensure kernel names are sorted for finding the lowest one
     logging.debug(f"Kernel names: {kernel_names}")
 
+    # Read each summary file once and fan its values out to every category
+    data_by_category = {category: {} for category in categories}
+    stdev_by_category = {category: {} for category in categories}  # Dictionary to store standard deviation data
+    for kernel_name in kernel_names:
+        for benchmark in args.benchmarks:
+            summary = load_summary(kernel_name, benchmark, log_dir)
+            if summary:
+                for category in categories:
+                    value = extract_stat(summary, 'average', category)
+                    stdev_value = extract_stat(summary, 'stdev', category)
+                    data_by_category[category].setdefault(kernel_name, {})[benchmark] = value
+                    stdev_by_category[category].setdefault(kernel_name, {})[benchmark] = stdev_value
+
+    # One figure for all categories, so the figure and backend are set up only once
+    plt.rcParams['ytick.direction'] = 'in'
+    fig, ax = plt.subplots()
+    fig.subplots_adjust(bottom=0.3)  # adjust bottom margin
+
     for category in categories:
-        category_data = {}
-        stdev_data = {}  # Dictionary to store standard deviation data
+        category_data = data_by_category[category]
+        stdev_data = stdev_by_category[category]
         min_values = {}
 
-        for kernel_name in kernel_names:
-            for benchmark in args.benchmarks:
-                df = read_csv_data(kernel_name, benchmark, log_dir)
-                if not df.empty:
-                    value = extract_data(df, category)
-                    stdev_value = extract_stdev(df, category)
-                    if kernel_name not in category_data:
-                        category_data[kernel_name] = {}
-                        stdev_data[kernel_name] = {}
-                    category_data[kernel_name][benchmark] = value
-                    stdev_data[kernel_name][benchmark] = stdev_value
-
         if args.relative and kernel_names:
             min_kernel = kernel_names[0]
             for benchmark in args.benchmarks:
@@ -146,7 +135,9 @@ def main():
             if min_kernel in category_data:
                 del category_data[min_kernel]
 
-        plot_data(category_data, stdev_data, category, args.benchmarks, log_dir, args.relative)
+        plot_data(ax, category_data, stdev_data, category, args.benchmarks, log_dir, args.relative)
+
+    plt.close(fig)
 
 if __name__ == "__main__":
     main()
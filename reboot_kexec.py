@@ -1,15 +1,13 @@
 #! /usr/env/bin python
 import sys
-from subprocess import Popen, PIPE
+from subprocess import run, PIPE
 
 
 def exec_cmd(cmd):
     print(cmd)
-    with Popen(cmd, stdout=PIPE) as proc:
-        out, _ = proc.communicate()
-        proc.wait()
-        print(out.decode('utf-8'))
-        return out.decode('utf-8')
+    out = run(cmd, stdout=PIPE, check=False).stdout.decode('utf-8', 'replace')
+    print(out)
+    return out
 
 
 def main():
@@ -1,17 +1,40 @@
-import csv
+import os
+import re
 import logging
+import sys
+import shutil
+import signal
 import argparse
-import threading
 import subprocess
-import statistics
-import cpuusage_monitor
-from typing import List, Dict
+import multiprocessing
+import concurrent.futures
+import numpy as np
+from typing import List, Iterator, Optional, TextIO, Tuple
 import matplotlib.pyplot as plt
 from utils.exectime_logging_util import *
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+METRICS = ["total", "real", "user", "sys"]
+# One parsed iteration: (total, real, user, sys) in seconds
+BenchmarkResult = Tuple[float, float, float, float]
+WRITE_BUFFER_SIZE = 1 << 20
+# Seconds are written with microsecond precision to the processed and summary CSVs
+VALUE_FORMAT = "%.6f"
+OUTPUT_START_MARKER = "[PARSEC] [---------- Beginning of output ----------]"
+SECTION_DELIMITER = "[PARSEC] [----------    End of output    ----------]"
+# Matches the `time` lines (real/user/sys) and the hooks' ROI time in a single scan
+OUTPUT_PATTERN = re.compile(r'^(real|user|sys)\s+(\S+)|Total time spent in ROI\D*([\d.]+)s', re.M)
+# Resolved once: an absolute executable path (with close_fds=False and no shell)
+# lets subprocess launch the benchmark through posix_spawn() instead of fork()+exec()
+PARSECMGMT_PATH = shutil.which("parsecmgmt") or "parsecmgmt"
+CPUUSAGE_MONITOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpuusage_monitor.py")
+# Seconds to wait for the monitor to finish after the benchmark has exited
+MONITOR_EXIT_TIMEOUT = 5.0
+# Same as `uname -r`; looked up once per process
+_KERNEL_NAME = os.uname().release
+
 class ExperimentConfig:
     def __init__(self, benchmarks: List[str], iterations: int = 1, threads: int = 1, mode: str = "both", inputset: str = "native"):
         self.benchmarks = benchmarks
@@ -19,122 +42,151 @@ class ExperimentConfig:
         self.threads = threads
         self.mode = mode
         self.inputset = inputset
-        self.kernel_name = self.get_kernel_name()
-    
-    @staticmethod
-    def get_kernel_name() -> str:
-        try:
-            kernel_name = subprocess.check_output("uname -r", shell=True).decode().strip()
-            logging.debug(f"Kernel name: {kernel_name}")
-            return kernel_name
-        except subprocess.CalledProcessError as e:
-            logging.error("Failed to get kernel name")
-            raise e
+        self.kernel_name = _KERNEL_NAME
+        logging.debug(f"Kernel name: {self.kernel_name}")
 
 def repeat_benchmark(raw_file: str, benchmark: str, config: ExperimentConfig):
     iterations = config.iterations
     inputset = config.inputset
-    for i in range(iterations):
-        output = run_benchmark_once(raw_file, benchmark, i, config)
-        save_raw_output(raw_file, benchmark, output)
+    # Keep the raw log open across iterations, hand each finished iteration to the
+    # kernel so a crash doesn't lose it, and sync it once the benchmark is done
+    with open(raw_file, 'a', buffering=WRITE_BUFFER_SIZE) as f:
+        for i in range(iterations):
+            run_benchmark_once(f, benchmark, i, config)
+            f.flush()
+        os.fsync(f.fileno())
+    logging.debug(f"Raw output written to {raw_file}")
+
+def start_cpuusage_monitor(log_file: str) -> subprocess.Popen:
+    # A separate process keeps the sampling loop off this interpreter's GIL
+    cmd = [sys.executable, CPUUSAGE_MONITOR_PATH, "-l", log_file, "-i", "1.0", "-m", "silent"]
+    return subprocess.Popen(cmd, close_fds=False)
+
+def stop_cpuusage_monitor(monitor: subprocess.Popen):
+    # The monitor exits by itself shortly after parsecmgmt does; interrupt it if it
+    # is still waiting (e.g. parsecmgmt failed before it was found) so it flushes its log
+    try:
+        monitor.wait(timeout=MONITOR_EXIT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logging.warning("CPU usage monitor did not exit, interrupting it")
+        monitor.send_signal(signal.SIGINT)
+        monitor.wait()
 
-def run_benchmark_once(raw_file: str, benchmark: str, benchmark_iter: int, config: ExperimentConfig) -> str:
+def run_benchmark_once(raw_output: TextIO, benchmark: str, benchmark_iter: int, config: ExperimentConfig) -> Optional[BenchmarkResult]:
     try:
         inputset = config.inputset
         threads = config.threads
-        exec_cmd = f"parsecmgmt -a run -x pre -p {benchmark} -n {threads} -c gcc-hooks -i {inputset}"
-        monitor_thread = threading.Thread(target=cpuusage_monitor.main, args=(f"./log/{config.kernel_name}--{benchmark}-cpuusage.csv", 1.0, "silent"))
-        monitor_thread.start()
-        logging.debug("Execute: " + exec_cmd)
-        output = subprocess.check_output(exec_cmd, shell=True).decode()
-        monitor_thread.join()
-        logging.debug(f"Benchmark output (iteration {benchmark_iter + 1}): {output}")
+        exec_cmd = [PARSECMGMT_PATH, "-a", "run", "-x", "pre", "-p", benchmark, "-n", str(threads), "-c", "gcc-hooks", "-i", inputset]
+        monitor = start_cpuusage_monitor(f"./log/{config.kernel_name}--{benchmark}-cpuusage.csv")
+        try:
+            logging.debug("Execute: " + " ".join(exec_cmd))
+            # Tee the output line by line into the raw log and the parser instead of buffering it whole
+            parser = RawParser()
+            result = None
+            with subprocess.Popen(exec_cmd, stdout=subprocess.PIPE, encoding='utf-8', bufsize=1, close_fds=False) as proc:
+                for line in proc.stdout:
+                    raw_output.write(line)
+                    # The result is only logged here, so a parse error must not abort the measurement
+                    try:
+                        result = parser.feed(line) or result
+                    except ValueError as e:
+                        logging.warning(f"Could not parse output of {benchmark} on iteration {benchmark_iter + 1}: {e}")
+            raw_output.write('\n') # add a newline character for better readability
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, exec_cmd)
+        finally:
+            stop_cpuusage_monitor(monitor)
+        try:
+            result = parser.close() or result
+        except ValueError as e:
+            logging.warning(f"Could not parse output of {benchmark} on iteration {benchmark_iter + 1}: {e}")
+        logging.debug(f"Benchmark result (iteration {benchmark_iter + 1}): {result}")
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to run benchmark {benchmark} on iteration {benchmark_iter + 1}")
         raise e
-    return output
+    return result
 
-def parse_output(output: str) -> Dict[str, float]:
+def parse_output(output: str) -> Optional[BenchmarkResult]:
     result = {}
-    for line in output.split('\n'):
-        if line.startswith("real"):
-            result["real"] = parse_time(line.split()[1])
-        elif line.startswith("user"):
-            result["user"] = parse_time(line.split()[1])
-        elif line.startswith("sys"):
-            result["sys"] = parse_time(line.split()[1])
-        elif "Total time spent in ROI" in line:
-            result["total"] = float(line.split()[-1].replace('s', ''))
+    for match in OUTPUT_PATTERN.finditer(output):
+        key, time_str, roi_time = match.groups()
+        if key:
+            result[key] = parse_time(time_str)
+        else:
+            result["total"] = float(roi_time)
     logging.debug(f"Parsed result: {result}")
-    return result
+    if not result:
+        return None
+    missing = [metric for metric in METRICS if metric not in result]
+    if missing:
+        logging.warning(f"Skipping incomplete benchmark output, missing: {', '.join(missing)}")
+        return None
+    return tuple(result[metric] for metric in METRICS)
 
 def parse_time(time_str: str) -> float:
-    minutes, seconds = time_str.split('m')
-    return float(minutes) * 60 + float(seconds.replace('s', ''))
-
-def parse_raw_file(file_path: str) -> List[Dict[str, float]]:
-    section_delimiter = "[PARSEC] [----------    End of output    ----------]"
-    output_start_marker = "[PARSEC] [---------- Beginning of output ----------]"
-    results = []
+    # Fixed `time` format <minutes>m<seconds>s, e.g. 1m2.345s
+    m = time_str.index('m')
+    return float(time_str[:m]) * 60 + float(time_str[m + 1:-1])
+
+class RawParser:
+    """Split PARSEC output into sections line by line and parse each section as it closes."""
+    def __init__(self):
+        self.section = []
+        self.in_section = False
+
+    def feed(self, line: str) -> Optional[BenchmarkResult]:
+        """Consume one line; returns the parsed result when the line closes a section."""
+        if OUTPUT_START_MARKER in line:
+            self.section = []
+            self.in_section = True
+        elif SECTION_DELIMITER in line:
+            if self.in_section:
+                return self._close_section()
+        elif self.in_section:
+            self.section.append(line)
+        return None
+
+    def close(self) -> Optional[BenchmarkResult]:
+        """Parse a trailing section that was never closed, if any."""
+        return self._close_section() if self.in_section else None
+
+    def _close_section(self) -> Optional[BenchmarkResult]:
+        # Reset before parsing so a malformed section doesn't leak into the next one
+        output = "".join(self.section)
+        self.section = []
+        self.in_section = False
+        return parse_output(output)
+
+def parse_raw_file(file_path: str) -> Iterator[BenchmarkResult]:
+    # Single pass over the lines; only the section currently being read is held in memory
+    parser = RawParser()
     with open(file_path, 'r') as file:
-        content = file.read()
-    sections = content.split(section_delimiter)
-    for section in sections:
-        if output_start_marker in section:
-            output = section.split(output_start_marker)[1].strip()
-            result = parse_output(output)
+        for line in file:
+            result = parser.feed(line)
             if result:
-                results.append(result)
-    return results
-
-def parse_processed_file(file_path: str) -> List[Dict[str, float]]:
-    results = []
-    with open(file_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            results.append({
-                "total": float(row["total"]),
-                "real": float(row["real"]),
-                "user": float(row["user"]),
-                "sys": float(row["sys"])
-            })
-    return results
-
-def save_raw_output(filename: str, benchmark: str, output: str):
-    with open(filename, 'a') as f:
-        f.write(output)
-        f.write('\n') # add a newline character for better readability
-    logging.debug(f"Raw output written to {filename}")
-
-def save_processed_output(filename: str, benchmark: str, results: List[Dict[str, float]]):
-    with open(filename, 'w') as f:
-        writer = csv.writer(f)
-        writer.writerow(["iteration", "total", "real", "user", "sys"])
-        for i, result in enumerate(results):
-            writer.writerow([i + 1, result["total"], result["real"], result["user"], result["sys"]])
+                yield result
+    result = parser.close()
+    if result:
+        yield result
+
+def save_processed_output(filename: str, benchmark: str, results: np.ndarray):
+    # The schema is fixed, so let NumPy format the whole matrix in C instead of a csv.writer row by row
+    iterations = np.arange(1, len(results) + 1)
+    with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(",".join(["iteration"] + METRICS) + "\n")
+        np.savetxt(f, np.column_stack([iterations, results]), fmt=["%d"] + [VALUE_FORMAT] * len(METRICS), delimiter=",")
     logging.debug(f"Processed output written to {filename}")
 
-def save_summary_output(filename: str, results: List[Dict[str, float]]):
-    summary = {
-        "total": [r["total"] for r in results],
-        "real": [r["real"] for r in results],
-        "user": [r["user"] for r in results],
-        "sys": [r["sys"] for r in results]
-    }
-
-    with open(filename, 'w') as f:
-        writer = csv.writer(f)
-        writer.writerow(["", "total", "real", "user", "sys"])
-        writer.writerow(["average", statistics.mean(summary["total"]), statistics.mean(summary["real"]),
-                         statistics.mean(summary["user"]), statistics.mean(summary["sys"])])
-        writer.writerow(["max", max(summary["total"]), max(summary["real"]),
-                         max(summary["user"]), max(summary["sys"])])
-        writer.writerow(["min", min(summary["total"]), min(summary["real"]),
-                         min(summary["user"]), min(summary["sys"])])
-        writer.writerow(["stdev", statistics.stdev(summary["total"]) if len(summary["total"]) > 1 else 0,
-                         statistics.stdev(summary["real"]) if len(summary["real"]) > 1 else 0,
-                         statistics.stdev(summary["user"]) if len(summary["user"]) > 1 else 0,
-                         statistics.stdev(summary["sys"]) if len(summary["sys"]) > 1 else 0])
+def save_summary_output(filename: str, results: np.ndarray):
+    # results holds one row per iteration and one column per metric, so each statistic is one reduction
+    stdev = results.std(axis=0, ddof=1) if len(results) > 1 else np.zeros(len(METRICS))
+    summary = np.vstack([results.mean(axis=0), results.max(axis=0), results.min(axis=0), stdev])
+
+    row_format = ",".join(["%s"] + [VALUE_FORMAT] * len(METRICS)) + "\n"
+    with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(",".join([""] + METRICS) + "\n")
+        for label, row in zip(["average", "max", "min", "stdev"], summary.tolist()):
+            f.write(row_format % (label, *row))
     logging.debug(f"Summary output written to {filename}")
 
 def build_parser() -> argparse.ArgumentParser:
@@ -146,6 +198,21 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument('-i', '--inputset', choices=['test', 'native'], default='native', help='Input set (default: native)')
     return parser
 
+def get_log_files(log_path: str, kernel_name: str, benchmark: str) -> Tuple[str, str, str]:
+    raw_file = f"{log_path}/{kernel_name}--{benchmark}-raw.txt"
+    processed_file = f"{log_path}/{kernel_name}--{benchmark}-processed.csv"
+    summary_file = f"{log_path}/{kernel_name}--{benchmark}-summary.csv"
+    return raw_file, processed_file, summary_file
+
+def analyze_benchmark(log_path: str, kernel_name: str, benchmark: str):
+    raw_file, processed_file, summary_file = get_log_files(log_path, kernel_name, benchmark)
+    delete_file(processed_file)
+    delete_file(summary_file)
+    # The processed CSV is kept for inspection only; the summary is computed from the same results
+    raw_content = np.array(list(parse_raw_file(raw_file)), dtype=np.float64).reshape(-1, len(METRICS))
+    save_processed_output(processed_file, benchmark, raw_content)
+    save_summary_output(summary_file, raw_content)
+
 def main():
     parser = build_parser()
     args = parser.parse_args()
@@ -154,24 +221,28 @@ def main():
     log_path = get_config("log_path")
     create_directory(log_path)
 
-    for benchmark in config.benchmarks:
-        raw_file = f"{log_path}/{config.kernel_name}--{benchmark}-raw.txt"
-        processed_file = f"{log_path}/{config.kernel_name}--{benchmark}-processed.csv"
-        summary_file = f"{log_path}/{config.kernel_name}--{benchmark}-summary.csv"
-
-        if config.mode in ['run', 'both']:
+    if config.mode in ['run', 'both']:
+        # Runs are the measurement itself and share the machine, so they stay sequential.
+        # Each finished run is analyzed right away so a later failure doesn't lose its summary.
+        for benchmark in config.benchmarks:
+            raw_file, processed_file, summary_file = get_log_files(log_path, config.kernel_name, benchmark)
             delete_file(raw_file)
             delete_file(processed_file)
             delete_file(summary_file)
             repeat_benchmark(raw_file, benchmark, config)
-
-        if config.mode in ['analyze', 'both']:
-            delete_file(processed_file)
-            delete_file(summary_file)
-            raw_content = parse_raw_file(raw_file)
-            save_processed_output(processed_file, benchmark, raw_content)
-            processed_content = parse_processed_file(processed_file)
-            save_summary_output(summary_file, processed_content)
+            if config.mode == 'both':
+                analyze_benchmark(log_path, config.kernel_name, benchmark)
+
+    elif config.mode == 'analyze':
+        # Analysis only reads finished logs, so benchmarks are processed in parallel
+        max_workers = min(len(config.benchmarks), os.cpu_count() or 1)
+        # Fork (POSIX only, like os.uname()) so workers start with NumPy already imported
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                    mp_context=multiprocessing.get_context("fork")) as executor:
+            futures = [executor.submit(analyze_benchmark, log_path, config.kernel_name, benchmark)
+                       for benchmark in config.benchmarks]
+            for future in futures:
+                future.result()
 
 if __name__ == '__main__':
     main()
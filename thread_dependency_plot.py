@@ -1,14 +1,19 @@
 import os
+import re
+import glob
 import argparse
 import logging
+import datetime
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import List, Dict
-from datetime import datetime
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Result directories are named <YYYY-MM-DD>-t<#threads>
+RESULT_DIR_PATTERN = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})-t(\d+)$')
+
 def create_directory(directory: str):
     if not os.path.exists(directory):
         os.makedirs(directory)
@@ -25,86 +30,82 @@ def parse_args() -> argparse.Namespace:
 def get_latest_dirs(log_dir: str) -> Dict[int, str]:
     """Get the latest directories for each thread number."""
     latest_dirs = {}
-    for subdir in os.listdir(log_dir):
-        if subdir.count('-t') == 1:
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            match = RESULT_DIR_PATTERN.match(entry.name)
+            if not match or not entry.is_dir():
+                continue
             try:
-                date_str, thread_num_str = subdir.rsplit('-t', 1)
-                if not date_str.replace("-", "").isdigit() or not thread_num_str.isdigit():
-                    continue
-                thread_num = int(thread_num_str)
-                date = datetime.strptime(date_str, '%Y-%m-%d')
-                if thread_num not in latest_dirs or date > latest_dirs[thread_num][0]:
-                    latest_dirs[thread_num] = (date, os.path.join(log_dir, subdir))
+                date = datetime.date(int(match[1]), int(match[2]), int(match[3]))
             except ValueError:
-                logging.warning(f"Skipping invalid directory: {subdir}")
+                logging.warning(f"Skipping invalid directory: {entry.name}")
+                continue
+            thread_num = int(match[4])
+            if thread_num not in latest_dirs or date > latest_dirs[thread_num][0]:
+                latest_dirs[thread_num] = (date, entry.path)
     return {k: v[1] for k, v in latest_dirs.items()}
 
-def load_data(log_dir: str, benchmarks: List[str]) -> Dict[str, Dict[str, pd.DataFrame]]:
+def load_data(log_dir: str, benchmarks: List[str]) -> Dict[str, Dict[str, Dict[str, pd.DataFrame]]]:
     """Load benchmark data from CSV files."""
-    data = {}
     latest_dirs = get_latest_dirs(log_dir)
     if not latest_dirs:
         logging.error("No valid directories found.")
         raise RuntimeError("No valid directories found.")
     
+    # Collect (#threads, average) pairs first and build each DataFrame once at the end
+    rows = {}
     for benchmark in benchmarks:
-        data[benchmark] = {}
+        rows[benchmark] = {}
         for thread_num, subdir in latest_dirs.items():
-            for file in os.listdir(subdir):
-                if file.endswith(f'{benchmark}-summary.csv'):
-                    kernel_version = file.split('--')[0]
-                    if kernel_version not in data[benchmark]:
-                        data[benchmark][kernel_version] = {}
-                    df = pd.read_csv(os.path.join(subdir, file), index_col=0)
-                    df['#threads'] = thread_num
-                    for mode in df.columns:
-                        if mode not in data[benchmark][kernel_version]:
-                            data[benchmark][kernel_version][mode] = pd.DataFrame()
-                        data[benchmark][kernel_version][mode] = pd.concat([data[benchmark][kernel_version][mode], df.loc[['average'], [mode, '#threads']]])
-    return data
+            for file_path in glob.iglob(os.path.join(glob.escape(subdir), f'*--{benchmark}-summary.csv')):
+                kernel_version = os.path.basename(file_path).split('--')[0]
+                kernel_rows = rows[benchmark].setdefault(kernel_version, {})
+                df = pd.read_csv(file_path, index_col=0)
+                for mode, value in df.loc['average'].items():
+                    kernel_rows.setdefault(mode, []).append((thread_num, value))
+    
+    return {
+        benchmark: {
+            kernel_version: {
+                mode: pd.DataFrame(mode_rows, columns=['#threads', mode]).sort_values('#threads', kind='mergesort')
+                for mode, mode_rows in kernel_rows.items()
+            }
+            for kernel_version, kernel_rows in benchmark_rows.items()
+        }
+        for benchmark, benchmark_rows in rows.items()
+    }
 
-def plot_data(log_dir: str, data: Dict[str, Dict[str, pd.DataFrame]], benchmarks: List[str]):
+def plot_data(log_dir: str, data: Dict[str, Dict[str, Dict[str, pd.DataFrame]]], benchmarks: List[str]):
     """Plot the data for each benchmark and mode."""
     modes = ['total', 'real', 'user', 'sys']
     colors = plt.get_cmap('tab10')
     kernel_versions = sorted({kernel for benchmark_data in data.values() for kernel in benchmark_data})
     color_map = {kernel: colors(i % 10) for i, kernel in enumerate(kernel_versions)}
+    save_path = os.path.join(log_dir, 'fig_thread_dependency')
+    create_directory(save_path)
     
     for benchmark in benchmarks:
         for mode in modes:
-            save_path = os.path.join(log_dir, 'fig_thread_dependency')
-            create_directory(save_path)
-            
-            # Plot with y-axis starting at 0
-            plt.figure()
+            fig, ax = plt.subplots()
+            lines = 0
             for kernel_version, mode_data in data[benchmark].items():
                 if mode in mode_data:
+                    # load_data() already sorted the rows by #threads
                     df = mode_data[mode]
-                    df.sort_values(by='#threads', inplace=True)
-                    plt.plot(df['#threads'], df[mode], label=kernel_version, marker='o', color=color_map[kernel_version])
-            plt.xlabel('#threads')
-            plt.ylabel('Execution time (s)')
-            plt.title(f'{benchmark} - {mode}')
-            plt.legend()
-            plt.grid(True)
-            plt.ylim(bottom=0)  # Set the y-axis to start from 0
-            plt.savefig(f'{save_path}/{mode}_{benchmark}.png')
-            plt.close()
+                    ax.plot(df['#threads'].to_numpy(), df[mode].to_numpy(), label=kernel_version, marker='o', color=color_map[kernel_version])
+                    lines += 1
+            ax.set_xlabel('#threads')
+            ax.set_ylabel('Execution time (s)')
+            ax.set_title(f'{benchmark} - {mode}')
+            if lines:
+                ax.legend()
+                ax.grid(True)
             
-            # Plot with original y-axis range
-            plt.figure()
-            for kernel_version, mode_data in data[benchmark].items():
-                if mode in mode_data:
-                    df = mode_data[mode]
-                    df.sort_values(by='#threads', inplace=True)
-                    plt.plot(df['#threads'], df[mode], label=kernel_version, marker='o', color=color_map[kernel_version])
-            plt.xlabel('#threads')
-            plt.ylabel('Execution time (s)')
-            plt.title(f'{benchmark} - {mode}')
-            plt.legend()
-            plt.grid(True)
-            plt.savefig(f'{save_path}/{mode}_{benchmark}-up.png')
-            plt.close()
+            # Same figure twice: first with the original y-axis range, then with the y-axis starting at 0
+            fig.savefig(f'{save_path}/{mode}_{benchmark}-up.png')
+            ax.set_ylim(bottom=0)
+            fig.savefig(f'{save_path}/{mode}_{benchmark}.png')
+            plt.close(fig)
 
 def main():
     # Parse arguments
@@ -21,16 +21,22 @@ def delete_file(file_path: str) -> None:
         raise OSError(f"Error deleting file '{file_path}': {e}")
 
 import yaml
+import functools
+
+@functools.lru_cache(maxsize=None)
+def _load_config(config_path: str) -> dict:
+    # Parsed once per path; later lookups only hit the cached dict
+    with open(config_path, 'r') as file:
+        return yaml.safe_load(file) or {}
 
 def get_config(key: str) -> str:
     try:
         config_path = "./config.yaml"
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
-            log_string = config.get(key, '')
-            if not isinstance(log_string, str):
-                raise ValueError(f"Expected {key} to be a string, but got {type(log_string).__name__}")
-            return log_string
+        config = _load_config(config_path)
+        log_string = config.get(key, '')
+        if not isinstance(log_string, str):
+            raise ValueError(f"Expected {key} to be a string, but got {type(log_string).__name__}")
+        return log_string
     except FileNotFoundError:
         print(f"The file {config_path} was not found.")
         return ''